@@ -1,30 +1,43 @@
+import argparse
+import hashlib
 import os
 import pprint as pp
-import random
+import re
+import tempfile
+import threading
 import time
 import urllib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from datetime import datetime
 from os.path import join
 
-import gensim.downloader as api
 import numpy as np
 import pandas as pd
-import plotly.express as px
-import pyshorteners
 import requests
-import tensorflow_hub as hub
-import texthero as hero
-from bs4 import BeautifulSoup
-from kneed import KneeLocator
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
+from bs4 import BeautifulSoup, SoupStrainer
+from numba import njit, prange
+
+# the ML / plotting libraries (gensim, tensorflow_hub, texthero, plotly, sklearn,
+# ...) are slow to import and not needed for scraping, so they are imported
+# inside the functions that use them
+
+
+# one session for all http requests: keep-alive / connection pooling means TLS
+# handshakes are not repeated for every page or link
+http_session = requests.Session()
+http_session.headers.update({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+})
+http_timeout = 10  # seconds
 
 
 def save_jobs_to_excel(jobs_list, filename, verbose=False):
-    # i have no idea what this function does
-    jobs = pd.DataFrame(jobs_list)
-    jobs.to_excel(filename)
+    # 'jobs_list' is a dict of column name -> list of values
+    jobs = pd.DataFrame.from_dict(jobs_list)
+    # xlsxwriter is a much faster writer than the default openpyxl
+    jobs.to_excel(filename, engine="xlsxwriter")
 
     if verbose:
         print("saved the following to excel with filename {}: \n".format(filename))
@@ -33,18 +46,48 @@ def save_jobs_to_excel(jobs_list, filename, verbose=False):
     return jobs
 
 
-def shorten_URL_bitly(long_url, verbose=False):
+class RateLimiter:
+    # thread-safe limiter: spaces out calls to wait() so that at most
+    # 'calls_per_sec' go through per second, across all threads
+
+    def __init__(self, calls_per_sec):
+        self.interval = 1.0 / calls_per_sec
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+bitly_api_url = "https://api-ssl.bitly.com/v4/shorten"
+bitly_max_qps = 5  # max requests per second sent to the bitly API
+
+
+def shorten_URL_bitly(long_url, session=None, rate_limiter=None, verbose=False):
     # requires free account / API token. https://bitly.com/
     # generate short URLs from the ones scraped 
+    # pass a RateLimiter (don't overload API) when shortening many links, see
+    # indeed_postprocess. 'session' defaults to the module-level http_session
 
-    time.sleep(random.randint(1, 5))  # don't overload API
+    if rate_limiter is not None:
+        rate_limiter.wait()
+    if session is None:
+        session = http_session
 
     ACCESS_TOKEN = "hahah_get_ur_own"
 
     # Shorten long URL
     try:
-        s = pyshorteners.Shortener(api_key=ACCESS_TOKEN)
-        short_url = s.bitly.short(long_url)
+        response = session.post(bitly_api_url, json={"long_url": long_url},
+                                headers={"Authorization": "Bearer " + ACCESS_TOKEN},
+                                timeout=http_timeout)
+        response.raise_for_status()
+        short_url = response.json()["link"]
 
         if verbose:
             print("Short URL is {}".format(short_url))
@@ -56,24 +99,138 @@ def shorten_URL_bitly(long_url, verbose=False):
     return short_url
 
 
-def text_first_N(text, num=40):
-    # returns the first N chars in text, i.e. for long job descriptions
-    # for use with Pandas .apply() function
+def text_first_N_series(text_series, num=40):
+    # returns the first N chars of every text in the series (+ ".." if cut), i.e. for
+    # long job descriptions. vectorized, no per-row .apply. missing values become "nan"
+    text_series = text_series.fillna("nan").astype(str)
+    return text_series.where(text_series.str.len() <= num,
+                             text_series.str[:num] + "..")
 
-    text = str(text)  # convert to string
 
-    if isinstance(text, list):
-        text = " ".join(text)
+def plot_content_hash(coords, labels, viz_type):
+    # short hash of what actually ends up in a plot: the 2D coordinates, the cluster
+    # labels and the reduction used. same scraped data -> same hash on re-runs
+    hasher = hashlib.blake2b(np.ascontiguousarray(coords).tobytes(), digest_size=6)
+    hasher.update("\x1f".join(map(str, labels)).encode("utf-8"))
+    hasher.update(str(viz_type).encode("utf-8"))
+    return hasher.hexdigest()
 
-    if len(text) <= num:
-        return text
-    else:
-        short_text = text[:num]
-        return short_text + ".."
+
+def save_plot_html(fig, filename_stem, coords, labels, viz_type, verbose=True):
+    # writes fig as html to <filename_stem>_<content hash>.html. plotly's html export
+    # serializes the whole figure to json, so skip it if that exact plot already exists
+    plot_path = filename_stem + "_" + plot_content_hash(coords, labels, viz_type) + ".html"
+    if os.path.exists(plot_path):
+        if verbose:
+            print("plot already saved, skipping write: ", plot_path)
+        return plot_path
+    fig.write_html(plot_path, include_plotlyjs=True)
+    return plot_path
+
+
+@njit(nogil=True, fastmath=True, cache=True)
+def _assign_clusters(X, x_sq_norms, centers, labels):
+    # assign each row of X to its nearest center, return the SSE (inertia).
+    # squared distances are expanded as ||x||^2 + ||c||^2 - 2 x.c so the bulk
+    # of the work is a single matrix product (BLAS)
+    c_sq_norms = (centers * centers).sum(axis=1)
+    dots = X @ centers.T
+
+    inertia = 0.0
+    for i in range(X.shape[0]):
+        # start from center 0 rather than np.inf: fastmath lets the compiler assume
+        # there are no infinities
+        best_dist = x_sq_norms[i] + c_sq_norms[0] - 2.0 * dots[i, 0]
+        best_j = 0
+        for j in range(1, centers.shape[0]):
+            dist = x_sq_norms[i] + c_sq_norms[j] - 2.0 * dots[i, j]
+            if dist < best_dist:
+                best_dist = dist
+                best_j = j
+        labels[i] = best_j
+        inertia += max(best_dist, 0.0)  # rounding can make tiny distances negative
+    return inertia
+
+
+@njit(nogil=True, fastmath=True, cache=True)
+def lloyd_kmeans(X, x_sq_norms, init_centers, max_iter, tol):
+    # plain Lloyd iterations from 'init_centers'. returns (centers, labels, inertia)
+    # 'x_sq_norms' are the squared row norms of X, computed once by the caller
+    n, d = X.shape
+    k = init_centers.shape[0]
+    centers = init_centers.copy()
+    labels = np.zeros(n, dtype=np.int64)
+
+    for _ in range(max_iter):
+        _assign_clusters(X, x_sq_norms, centers, labels)
+
+        # update step - fused sum over the rows of each cluster
+        new_centers = np.zeros_like(centers)
+        counts = np.zeros(k, dtype=np.int64)
+        for i in range(n):
+            counts[labels[i]] += 1
+            for f in range(d):
+                new_centers[labels[i], f] += X[i, f]
+
+        shift = 0.0
+        for j in range(k):
+            for f in range(d):
+                if counts[j] > 0:
+                    new_centers[j, f] /= counts[j]
+                else:
+                    new_centers[j, f] = centers[j, f]  # keep empty clusters in place
+                diff = new_centers[j, f] - centers[j, f]
+                shift += diff * diff
+        centers = new_centers
+
+        if shift <= tol:
+            break
+
+    inertia = _assign_clusters(X, x_sq_norms, centers, labels)
+    return centers, labels, inertia
+
+
+def kmeans_sse(features, k, kmeans_kwargs, minibatch_above=1000, x_sq_norms=None):
+    # fit k-means with k clusters and return the SSE (inertia) of the best of
+    # 'n_init' k-means++ seeded runs. dense input uses the compiled lloyd_kmeans
+    # kernel, sparse (tfidf) input goes through sklearn
+    # 'x_sq_norms' (squared row norms of dense 'features') can be passed in so
+    # they are computed once for a whole sweep over k
+    from scipy.sparse import issparse
+    from sklearn.cluster import KMeans, MiniBatchKMeans, kmeans_plusplus
+
+    # the elbow only needs the rough shape of the SSE curve, so for more than
+    # 'minibatch_above' rows the (much cheaper) MiniBatchKMeans is good enough
+    n_rows = features.shape[0]
+    if n_rows > minibatch_above:
+        kmeans = MiniBatchKMeans(n_clusters=k, batch_size=min(256, n_rows), n_init=5,
+                                 max_iter=100, random_state=kmeans_kwargs["random_state"])
+        kmeans.fit(features)
+        return kmeans.inertia_
+
+    if issparse(features):
+        kmeans = KMeans(n_clusters=k, init="k-means++", **kmeans_kwargs)
+        kmeans.fit(features)
+        return kmeans.inertia_
+
+    X = np.ascontiguousarray(features)
+    if x_sq_norms is None:
+        x_sq_norms = (X * X).sum(axis=1)
+    tol = 1e-4 * np.mean(np.var(X, axis=0))  # same relative tolerance as sklearn
+    rng = np.random.RandomState(kmeans_kwargs["random_state"])
+
+    best_inertia = np.inf
+    for _ in range(kmeans_kwargs["n_init"]):
+        init_centers, _ = kmeans_plusplus(X, k, x_squared_norms=x_sq_norms, random_state=rng)
+        _, _, inertia = lloyd_kmeans(X, x_sq_norms, init_centers,
+                                     kmeans_kwargs["max_iter"], tol)
+        best_inertia = min(best_inertia, inertia)
+
+    return best_inertia
 
 
 def optimal_num_clustas(input_matrix, d_title, top_end=11, show_plot=False,
-                        write_image=False, output_path_full=None):
+                        write_image=False, output_path_full=None, minibatch_above=1000):
     # given 'input_matrix' as a pandas series containing a list / vector in each
     # row, find the optimal number of k_means clusters to cluster them using 
     # the elbow method
@@ -81,32 +238,50 @@ def optimal_num_clustas(input_matrix, d_title, top_end=11, show_plot=False,
     # 'top_end' is the max number of clusters. If having issues, look at the plot
     # and adjust accordingly
 
+    # 'minibatch_above' is the number of rows above which the sweep uses
+    # MiniBatchKMeans. the final clustering always uses full k-means
+
+    import plotly.express as px
+    from joblib import Parallel, delayed
+    from kneed import KneeLocator
+    from sklearn.preprocessing import MaxAbsScaler
+
     if output_path_full is None: output_path_full = os.getcwd()
-    scaler = StandardScaler()
     # texthero input data structure is weird.
     #  stole the below if/else from the source code behind TH kmeans fn
     # https://github.com/jbesomi/texthero/blob/master/texthero/representation.py
 
     if isinstance(input_matrix, pd.DataFrame):
         # fixes weird issues parsing a texthero edited text pd series
+        # sparse (tfidf) input: MaxAbsScaler scales without densifying
         input_matrix_coo = input_matrix.sparse.to_coo()
-        input_matrix_for_vectorization = input_matrix_coo.astype("float64")
+        scaled_features = MaxAbsScaler().fit_transform(input_matrix_coo.astype(np.float32))
     else:
-        input_matrix_for_vectorization = list(input_matrix)
+        # dense embeddings (word2vec / USE) are already on a comparable scale,
+        # so they go to KMeans as-is
+        if isinstance(input_matrix, np.ndarray):
+            scaled_features = input_matrix
+        else:
+            scaled_features = np.vstack(list(input_matrix))
+        # single precision halves memory traffic in the k-means distance loops
+        scaled_features = np.ascontiguousarray(scaled_features, dtype=np.float32)
 
-    scaled_features = scaler.fit_transform(input_matrix_for_vectorization)
     kmeans_kwargs = {
-        "init": "random",
-        "n_init": 30,
+        "n_init": 10,
         "max_iter": 300,
         "random_state": 42
     }
-    # A list holds the SSE values for each k
-    sse = []
-    for k in range(1, top_end):
-        kmeans = KMeans(n_clusters=k, **kmeans_kwargs)
-        kmeans.fit(scaled_features)
-        sse.append(kmeans.inertia_)
+    # squared row norms are the same for every k, compute them once
+    if isinstance(scaled_features, np.ndarray):
+        x_sq_norms = (scaled_features * scaled_features).sum(axis=1)
+    else:
+        x_sq_norms = None
+
+    # A list holds the SSE values for each k. each k is independent, so fit
+    # them in parallel (the compiled kernel releases the GIL, threads suffice)
+    sse = Parallel(n_jobs=-1, prefer="threads")(
+        delayed(kmeans_sse)(scaled_features, k, kmeans_kwargs, minibatch_above, x_sq_norms)
+        for k in range(1, top_end))
 
     # plot to illustrate (viewing it is optional)
     title_k = 'Optimal k-means for' + d_title
@@ -138,7 +313,91 @@ def optimal_num_clustas(input_matrix, d_title, top_end=11, show_plot=False,
     return onk
 
 
+def kmeans_labels(vecs, n_clusters, **kmeans_kwargs):
+    # k-means cluster labels (as strings, for plot colors) for the rows of 'vecs'
+    from sklearn.cluster import KMeans
+
+    kmeans = KMeans(n_clusters=n_clusters, **kmeans_kwargs)
+    return kmeans.fit_predict(vecs).astype(str)
+
+
+def fit_shared_pca(vecs, n_components=50):
+    # fit the pre-tsne pca once on the stacked vectors of several plots, see the
+    # 'pca_model' arg of reduce_dimensions. returns None if there is nothing to reduce
+    try:
+        from cuml.decomposition import PCA
+    except ImportError:
+        from sklearn.decomposition import PCA
+
+    vecs = np.ascontiguousarray(vecs, dtype=np.float32)
+    if vecs.shape[1] <= n_components:
+        return None
+    return PCA(n_components=min(n_components, vecs.shape[0]), random_state=0).fit(vecs)
+
+
+def reduce_dimensions(vecs, viz_type="pca", pca_model=None):
+    # reduce the rows of 'vecs' to 2D with either pca or tsne. returns (N, 2) array
+    # if RAPIDS cuML is installed (i.e. there is a CUDA GPU), both run on the GPU
+    # 'pca_model' is an already fitted pca (fit_shared_pca) used for the pre-tsne
+    # reduction instead of fitting one on 'vecs'
+    try:
+        from cuml.decomposition import PCA
+        from cuml.manifold import TSNE as CumlTSNE
+        on_gpu = True
+    except ImportError:
+        from sklearn.decomposition import PCA
+        on_gpu = False
+
+    # pca / tsne are memory-bandwidth bound: hand them single precision,
+    # C-contiguous data so they don't upcast or copy internally
+    vecs = np.ascontiguousarray(vecs, dtype=np.float32)
+
+    if viz_type.lower() == "tsne":
+        # t-SNE cost scales with the input dimension, and pre-reducing 300-512D
+        # embeddings to 50D with pca also gives cleaner neighborhoods
+        if pca_model is not None:
+            vecs = np.ascontiguousarray(pca_model.transform(vecs), dtype=np.float32)
+        elif vecs.shape[1] > 50:
+            n_components = min(50, vecs.shape[0])
+            vecs = PCA(n_components=n_components, random_state=0).fit_transform(vecs)
+
+        if on_gpu:
+            reducer = CumlTSNE(n_components=2, method="barnes_hut", perplexity=30,
+                               random_state=42)
+            return np.asarray(reducer.fit_transform(vecs))
+
+        # openTSNE (FFT-accelerated gradients, approximate neighbors, multi-core)
+        # is much faster than sklearn's single-threaded Barnes-Hut, use it if installed
+        try:
+            from openTSNE import TSNE as OpenTSNE
+        except ImportError:
+            OpenTSNE = None
+
+        if OpenTSNE is not None:
+            reducer = OpenTSNE(n_components=2, n_jobs=-1, neighbors="annoy",
+                               negative_gradient_method="fft", initialization="pca",
+                               random_state=42)
+            return np.asarray(reducer.fit(vecs))
+
+        from sklearn.manifold import TSNE
+        reducer = TSNE(n_components=2, init="pca", random_state=42)
+    elif on_gpu:
+        reducer = PCA(n_components=2, random_state=42)
+    else:
+        # randomized svd only computes the 2 components needed, not a full svd
+        reducer = PCA(n_components=2, svd_solver="randomized", random_state=42)
+
+    return np.asarray(reducer.fit_transform(vecs))
+
+
 def viz_job_data(viz_df, text_col_name, save_plot=False, h=720):
+    import plotly.express as px
+    import texthero as hero
+
+    # shallow copy: columns added below don't end up in the caller's dataframe,
+    # and the (possibly large) existing columns are not copied
+    viz_df = viz_df.copy(deep=False)
+
     today = date.today()
     # Month abbreviation, day and year	
     td_str = today.strftime("%b-%d-%Y")
@@ -155,23 +414,17 @@ def viz_job_data(viz_df, text_col_name, save_plot=False, h=720):
             .astype(str)
     )
 
-    viz_df['pca'] = (
-        viz_df['tfidf']
-            .pipe(hero.pca)
-    )
+    pca_arr = np.asarray(viz_df['tfidf'].pipe(hero.pca).to_list())
 
     hv_list = list(viz_df.columns)
     hv_list.remove('tfidf')
-    hv_list.remove('pca')
     hv_list.remove('summary')
 
     plot_title = td_str + " Vizualize Companies by {} Data".format(text_col_name)
 
     # reformat data so don't have to use built-in plotting 
-
-    df_split_pca = pd.DataFrame(viz_df["pca"].to_list(), columns=['pca_x', 'pca_y'])
-    viz_df.drop(columns="pca", inplace=True)  # drop original PCA column
-    viz_df = pd.concat([viz_df, df_split_pca], axis=1)  # merge dataframes
+    viz_df['pca_x'] = pca_arr[:, 0]
+    viz_df['pca_y'] = pca_arr[:, 1]
 
     # plot pca data
     # texthero also features pther ways to reduce dimensions besides pca, see docs
@@ -184,14 +437,30 @@ def viz_job_data(viz_df, text_col_name, save_plot=False, h=720):
     fig_s.show()
 
     if save_plot:
-        fig_s.write_html(plot_title + ".html", include_plotlyjs=True)
+        save_plot_html(fig_s, plot_title, pca_arr, viz_df['kmeans'], "pca")
 
     print("plot generated - ", datetime.now())
 
 
-def load_gensim_word2vec(wvmodel="word2vec-google-news-300", verbose=False):
+def load_gensim_word2vec(wvmodel="word2vec-google-news-300", verbose=False,
+                         cache_dir=join("embed_cache", "word2vec_models")):
     # another option is the smaller: api.load("word2vec-ruscorpora-300")
-    loaded_model = api.load(wvmodel)
+    import gensim.downloader as api
+    from gensim.models import KeyedVectors
+
+    # the first run converts the downloaded model to native KeyedVectors (with
+    # vector norms precomputed) in 'cache_dir'. later runs memory-map that file
+    # instead of re-parsing the whole model into RAM. the files are multi-GB, so
+    # they go in their own (gitignored) directory, not the working directory
+    os.makedirs(cache_dir, exist_ok=True)
+    kv_path = join(cache_dir, wvmodel + ".kv")
+
+    if os.path.exists(kv_path):
+        loaded_model = KeyedVectors.load(kv_path, mmap='r')
+    else:
+        loaded_model = api.load(wvmodel)
+        loaded_model.fill_norms()
+        loaded_model.save(kv_path)
 
     print("loaded data for word2vec - ", datetime.now())
 
@@ -204,7 +473,7 @@ def load_gensim_word2vec(wvmodel="word2vec-google-news-300", verbose=False):
 
     print("testing gensim model...")
     test_string = "computer"
-    vector = loaded_model.wv[test_string]
+    vector = loaded_model[test_string]
 
     print("The shape of string {} is: \n {}".format(test_string, vector.shape))
     print("test complete - ", datetime.now())
@@ -227,21 +496,25 @@ def get_vector_freetext(input_text, model, verbose=0, cutoff=2):
     input_words = lower_it.split(" ")  # yes, this is an assumption
     usable_words = [word for word in input_words if len(word) > cutoff]
 
-    list_of_vectors = []
+    # look up all in-vocab words at once: one gather over the vector matrix
+    # instead of a python-level lookup (and exception) per word.
+    # 'model' is a gensim 4 KeyedVectors (key_to_index / vectors)
+    vocab = model.key_to_index
+    word_idx = [vocab[word] for word in usable_words if word in vocab]
     num_words_total = len(usable_words)
-    num_excluded = 0
+    num_excluded = num_words_total - len(word_idx)
 
-    for word in usable_words:
-        try:
-            this_vector = model.wv[word]
-            list_of_vectors.append(this_vector)
-        except:
-            num_excluded += 1
-            if verbose == 2:
+    if verbose == 2:
+        for word in usable_words:
+            if word not in vocab:
                 print("\nThe word/term {} is not in the model vocab.".format(word))
                 print("Excluding from representative vector")
 
-    rep_vec = np.mean(list_of_vectors, axis=0)
+    if len(word_idx) > 0:
+        rep_vec = model.vectors[np.asarray(word_idx, dtype=np.int64)].mean(axis=0)
+    else:
+        # no in-vocab words: zero vector, same as get_vectors_freetext
+        rep_vec = np.zeros(model.vector_size, dtype=model.vectors.dtype)
 
     if verbose > 0:
         print("Computed representative vector. Excluded {} words out of {}".format(num_excluded,
@@ -250,75 +523,161 @@ def get_vector_freetext(input_text, model, verbose=0, cutoff=2):
     return rep_vec
 
 
+@njit(parallel=True, fastmath=True, cache=True)
+def mean_vectors(token_idx, offsets, W, out):
+    # out[i] = mean of the rows of W listed in token_idx[offsets[i]:offsets[i + 1]]
+    # (CSR-style layout: the word indices of all documents in one flat array).
+    # documents without any in-vocab word get a zero vector
+    D = W.shape[1]
+    for i in prange(out.shape[0]):
+        s = np.zeros(D, dtype=np.float32)
+        n = offsets[i + 1] - offsets[i]
+        for k in range(offsets[i], offsets[i + 1]):
+            for d in range(D):
+                s[d] += W[token_idx[k], d]
+        for d in range(D):
+            out[i, d] = s[d] / max(n, 1)
+
+
+def get_vectors_freetext(input_texts, model, cutoff=2):
+    # batch version of get_vector_freetext: the mean word2vec vector of every
+    # text in 'input_texts', as one (N, D) float32 array. the averaging runs in
+    # the compiled mean_vectors kernel. 'model' is a gensim 4 KeyedVectors
+    vocab = model.key_to_index
+
+    # lowercase + split with pandas' vectorized string methods
+    split_texts = pd.Series(list(input_texts), dtype=object).str.lower().str.split(" ")
+
+    token_idx = []
+    offsets = [0]
+    for input_words in split_texts:  # yes, splitting on " " is an assumption
+        token_idx.extend(vocab[word] for word in input_words
+                         if len(word) > cutoff and word in vocab)
+        offsets.append(len(token_idx))
+
+    W = np.asarray(model.vectors, dtype=np.float32)
+    out = np.empty((len(input_texts), W.shape[1]), dtype=np.float32)
+    mean_vectors(np.asarray(token_idx, dtype=np.int64), np.asarray(offsets, dtype=np.int64),
+                 W, out)
+
+    return out
+
+
+class CachedEmbedder:
+    # wraps an embedding function with an on-disk cache: one .npy file per text,
+    # named by a hash of the text. only texts without a cached file are passed
+    # (in one call) to 'embed_fn', which must return one vector per input text.
+    # use a separate 'cache_dir' per embedding model
+
+    def __init__(self, embed_fn, cache_dir="embed_cache"):
+        self.embed_fn = embed_fn
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def embed(self, texts, verbose=False):
+        # returns the embeddings of 'texts' as one (N, D) float32 array.
+        # repeated texts (i.e. reposted boilerplate summaries) are only looked up
+        # / embedded once
+        all_texts = [str(t) for t in texts]
+        texts, inverse = np.unique(all_texts, return_inverse=True)
+        texts = texts.tolist()
+        if verbose:
+            print("{} unique texts out of {} ({:.0%})".format(len(texts), len(all_texts),
+                                                             len(texts) / max(len(all_texts), 1)))
+
+        keys = [hashlib.blake2b(t.encode(), digest_size=16).hexdigest() for t in texts]
+
+        vectors = [None] * len(texts)
+        missing = []
+        for i, key in enumerate(keys):
+            vec_path = join(self.cache_dir, key + ".npy")
+            if os.path.exists(vec_path):
+                vectors[i] = np.load(vec_path)
+            else:
+                missing.append(i)
+
+        if len(missing) > 0:
+            new_vectors = self.embed_fn([texts[i] for i in missing])
+            for i, vec in zip(missing, new_vectors):
+                np.save(join(self.cache_dir, keys[i] + ".npy"), vec)
+                vectors[i] = vec
+
+        return np.asarray(np.vstack(vectors), dtype=np.float32)[inverse.ravel()]
+
+
 def viz_job_data_word2vec(viz_df, text_col_name, save_plot=False, h=720,
-                          query_name="", show_text=False):
+                          query_name="", show_text=False, viz_type="pca"):
+    import plotly.express as px
+
+    # shallow copy: columns added below don't end up in the caller's dataframe,
+    # and the (possibly large) existing columns are not copied
+    viz_df = viz_df.copy(deep=False)
+
     today = date.today()
     # Month abbreviation, day and year	
     td_str = today.strftime("%b-%d-%Y")
 
-    # compute word2vec avg vector for each row of text
-    viz_df['avg_vec'] = viz_df[text_col_name].apply(get_vector_freetext,
-                                                    args=(w2v_model,))
+    # compute word2vec avg vector for each row of text. vectors are kept as one
+    # (N, D) array rather than a column of per-row lists. not disk-cached: the
+    # compiled averaging is cheaper than reading the vectors back from a cache
+    avg_vecs = get_vectors_freetext(viz_df[text_col_name].astype(str).tolist(), w2v_model)
 
     # get optimal number of kmeans. limit max to 15 for interpretability
     max_clusters = 15
-    if len(viz_df['avg_vec']) < max_clusters: max_clusters = len(viz_df['avg_vec'])
+    if len(avg_vecs) < max_clusters: max_clusters = len(avg_vecs)
 
-    kmeans_numC = optimal_num_clustas(viz_df['avg_vec'],
+    kmeans_numC = optimal_num_clustas(avg_vecs,
                                       d_title='word2vec-' + query_name,
                                       top_end=max_clusters)
 
-    # complete k-means clustering + pca dim red. w/ avg_vec
+    # complete k-means clustering + pca / tsne dim red. w/ avg_vecs
     if kmeans_numC is None:
         kmeans_numC = 5
 
-    viz_df['kmeans'] = (
-        viz_df['avg_vec']
-            .pipe(hero.kmeans, n_clusters=kmeans_numC,
-                  algorithm="elkan", random_state=42, n_init=30)
-            .astype(str)
-    )
-    # texthero has other algs to reduce dimensions besides pca, see docs
-    viz_df['pca'] = (
-        viz_df['avg_vec']
-            .pipe(hero.pca)
-    )
+    viz_df['kmeans'] = kmeans_labels(avg_vecs, n_clusters=kmeans_numC,
+                                     algorithm="elkan", random_state=42, n_init=30)
+    coords = reduce_dimensions(avg_vecs, viz_type=viz_type)
 
     # generate list of column names for hover_data
     hv_list = list(viz_df.columns)
-    hv_list.remove('avg_vec')
-    hv_list.remove('pca')
-    if "tfidf" in hv_list:
-        hv_list.remove('tfidf')
-    if "summary" in hv_list:
-        hv_list.remove('summary')
-
-    # reformat data so don't have to use texthero built-in plotting 
-    df_split_pca = pd.DataFrame(viz_df["pca"].to_list(),
-                                columns=['pca_x', 'pca_y'])
-    viz_df.drop(columns="pca", inplace=True)  # drop original PCA column
-    viz_df = pd.concat([viz_df, df_split_pca], axis=1)  # merge dataframes
+    for col in ["tfidf", "summary", "pca_x", "pca_y", "tsne_x", "tsne_y"]:
+        if col in hv_list:
+            hv_list.remove(col)
+
+    # setup labels (decides pca or tsne)
+    if viz_type.lower() == "tsne":
+        plt_coords = ['tsne_x', 'tsne_y']
+    else:
+        plt_coords = ['pca_x', 'pca_y']
+
+    # add the coordinates as columns so don't have to use texthero built-in plotting
+    viz_df[plt_coords[0]] = coords[:, 0]
+    viz_df[plt_coords[1]] = coords[:, 1]
 
     # set up plot pars (width, title, text)
     w = int(h * (4 / 3))
 
     if len(query_name) > 0:
         # user provided query_name so include
-        plot_title = td_str + " viz Jobs by '{}' via word2vec + pca".format(text_col_name) + " | " + query_name
+        plot_title = td_str + " viz Jobs by '{}' via word2vec + {}".format(text_col_name,
+                                                                          viz_type) + " | " + query_name
     else:
-        plot_title = td_str + " viz Jobs by '{}' via word2vec + pca".format(text_col_name)
+        plot_title = td_str + " viz Jobs by '{}' via word2vec + {}".format(text_col_name,
+                                                                          viz_type)
 
     if show_text:
-        # adds company names to the plot if you want
-        viz_df["companies_abbrev"] = viz_df["companies"].apply(text_first_N, num=15)
-        graph_text_label = "companies_abbrev"
+        # adds company names to the plot if you want. passed as one array to the
+        # scatter trace (no extra dataframe column or per-point annotations)
+        graph_text_label = text_first_N_series(viz_df["companies"], num=15).to_numpy()
     else:
         graph_text_label = None
 
     # plot dimension-reduced data
-    fig_w2v = px.scatter(viz_df, x="pca_x", y="pca_y", color="kmeans",
+    fig_w2v = px.scatter(viz_df, x=plt_coords[0], y=plt_coords[1], color="kmeans",
                          hover_data=hv_list, title=plot_title, height=h, width=w,
                          template="plotly_dark", text=graph_text_label)
+    if show_text:
+        fig_w2v.update_traces(textposition="top center")
     fig_w2v.show()
 
     # save if requested 
@@ -327,92 +686,160 @@ def viz_job_data_word2vec(viz_df, text_col_name, save_plot=False, h=720,
         # saves the HTML file 
         # auto-saving as a static image is a lil difficult so just click on the interactive
         # plot it generates 
-        fig_w2v.write_html(plot_title + query_name + "_" + text_col_name + ".html",
-                           include_plotlyjs=True)
+        save_plot_html(fig_w2v, plot_title + query_name + "_" + text_col_name,
+                       coords, viz_df['kmeans'], viz_type)
 
     print("plot generated - ", datetime.now())
 
 
+loaded_USE = None  # set by load_google_USE, the model is only loaded once
+
+
 def load_google_USE():
+    # loading USE (building the TF graph) is a super heavy step, so the model is
+    # loaded once per session and later calls return the same callable
+    global loaded_USE
+    if loaded_USE is not None:
+        return loaded_USE
+
+    import tensorflow as tf
+    import tensorflow_hub as hub
+
     st = time.time()
-    embed = hub.load("https://tfhub.dev/google/universal-sentence-encoder/4")
+    USE_model = hub.load("https://tfhub.dev/google/universal-sentence-encoder/4")
+
+    # fixed input signature: one traced graph for any batch size, no retracing
+    @tf.function(input_signature=[tf.TensorSpec([None], tf.string)])
+    def embed(texts):
+        return USE_model(texts)
+
     rt = (time.time() - st) / 60
     print("loaded google USE embeddings in {} minutes".format(round(rt, 2)))
 
+    loaded_USE = embed
     return embed
 
 
+def embed_batch(texts, USE_embedding, batch_size=64):
+    # run google USE over a list of texts in fixed-size batches. each call to the
+    # model has a large fixed overhead, so never call it once per row (i.e. via .apply)
+
+    # batches are sorted by word count (longest first) so that each batch holds
+    # texts of similar length and little time is spent on padding. results are
+    # scattered back into the original row order
+
+    texts = np.asarray(list(texts), dtype=object)
+    lengths = np.array([len(str(t).split()) for t in texts])
+    order = np.argsort(-lengths, kind="stable")
+
+    out = None
+    for i in range(0, len(texts), batch_size):
+        idx = order[i:i + batch_size]
+        emb = np.asarray(USE_embedding(texts[idx].tolist())).astype(np.float32, copy=False)
+        if out is None:
+            out = np.empty((len(texts), emb.shape[1]), dtype=emb.dtype)
+        out[idx] = emb
+
+    return out
+
+
+def precompute_embeddings(dfs_and_cols, USE_embedding, memmap_path=None):
+    # embed the text of several (dataframe, column name) pairs in one pass, i.e.
+    # for all plots at once instead of once per plot. returns (text -> vector dict,
+    # (N, D) matrix of all unique vectors). the dict can be passed to
+    # vizjobs_googleUSE as 'precomputed', the matrix i.e. to fit_shared_pca
+    # if 'memmap_path' is given the vectors are written to that .npy file (overwritten
+    # if it exists) and both the matrix and the dict rows are read-only views into it,
+    # so large scrapes don't keep the whole matrix in process memory between plots.
+    # note the full matrix is still built in RAM once while embedding, the memmap
+    # only frees it afterwards. use a path private to this run (i.e. from
+    # tempfile.mkstemp), the caller deletes the file when done
+    if not isinstance(USE_embedding, CachedEmbedder):
+        USE_embedding = google_USE_embedder(USE_embedding)
+
+    all_texts = pd.concat([df[col] for df, col in dfs_and_cols]).astype(str)
+    unique_texts = all_texts.drop_duplicates().tolist()
+    vectors = USE_embedding.embed(unique_texts)
+
+    if memmap_path is not None:
+        os.makedirs(os.path.dirname(memmap_path) or ".", exist_ok=True)
+        mm = np.lib.format.open_memmap(memmap_path, mode="w+", dtype=np.float32,
+                                       shape=vectors.shape)
+        mm[:] = vectors
+        mm.flush()
+        del mm, vectors
+        vectors = np.load(memmap_path, mmap_mode="r")
+
+    return dict(zip(unique_texts, vectors)), vectors
+
+
+def google_USE_embedder(USE_model, cache_dir=join("embed_cache", "google_USE")):
+    # CachedEmbedder around a loaded google USE model, embedding cache misses in
+    # batches with embed_batch
+    return CachedEmbedder(lambda texts: embed_batch(texts, USE_model), cache_dir=cache_dir)
+
+
 def vizjobs_googleUSE(viz_df, text_col_name, USE_embedding, save_plot=False, h=720,
-                      query_name="", show_text=False, viz_type="TSNE"):
+                      query_name="", show_text=False, viz_type="TSNE", precomputed=None,
+                      pca_model=None):
+    # 'precomputed' is an optional dict of text -> vector from precompute_embeddings
+    # 'pca_model' is an optional pca shared across plots, from fit_shared_pca
+    import plotly.express as px
+
+    # shallow copy: columns added below don't end up in the caller's dataframe,
+    # and the (possibly large) existing columns are not copied
+    viz_df = viz_df.copy(deep=False)
+
     today = date.today()
     # Month abbreviation, day and year	
     td_str = today.strftime("%b-%d-%Y")
 
-    # generate embeddings for google USE. USE_embedding MUST be passed in
-    embeddings = USE_embedding(viz_df[text_col_name])  # create list from np arrays
-    use = np.array(embeddings).tolist()  # add lists as dataframe column
-    viz_df['use_vec'] = use
+    # generate embeddings for google USE. USE_embedding MUST be passed in, either
+    # as a CachedEmbedder (see google_USE_embedder) or the raw loaded model.
+    # vectors are kept as one (N, D) array rather than a column of per-row lists
+    if precomputed is not None:
+        use_vecs = np.stack([precomputed[t] for t in viz_df[text_col_name].astype(str)])
+        use_vecs = use_vecs.astype(np.float32, copy=False)
+    else:
+        if not isinstance(USE_embedding, CachedEmbedder):
+            USE_embedding = google_USE_embedder(USE_embedding)
+        use_vecs = USE_embedding.embed(viz_df[text_col_name].tolist(), verbose=True)
 
     # get optimal number of kmeans. limit max to 15 for interpretability
     max_clusters = 15
-    if len(viz_df['use_vec']) < max_clusters: max_clusters = len(viz_df['use_vec'])
+    if len(use_vecs) < max_clusters: max_clusters = len(use_vecs)
 
-    kmeans_numC = optimal_num_clustas(viz_df['use_vec'],
+    kmeans_numC = optimal_num_clustas(use_vecs,
                                       d_title='google_USE-' + query_name,
                                       top_end=max_clusters)
 
-    # complete k-means clustering + pca dim red. w/ use_vec
+    # complete k-means clustering + pca dim red. w/ use_vecs
     if kmeans_numC is None:
         kmeans_numC = 5
 
-    viz_df['kmeans'] = (
-        viz_df['use_vec']
-            .pipe(hero.kmeans, n_clusters=kmeans_numC,
-                  algorithm="elkan", random_state=42, n_init=30)
-            .astype(str)
-    )
+    viz_df['kmeans'] = kmeans_labels(use_vecs, n_clusters=kmeans_numC,
+                                     algorithm="elkan", random_state=42, n_init=30)
 
     # use the vector for dimensionality reduction
 
-    if viz_type.lower() == "tsne":
-        viz_df['TSNE'] = (
-            viz_df['use_vec']
-                .pipe(hero.tsne, random_state=42)
-        )
-    else:
-        viz_df['pca'] = (
-            viz_df['use_vec']
-                .pipe(hero.pca)
-        )
+    coords = reduce_dimensions(use_vecs, viz_type=viz_type, pca_model=pca_model)
 
     # generate list of column names for hover_data in the html plot
 
     hv_list = list(viz_df.columns)
-    hv_list.remove('use_vec')
-
-    if "tfidf" in hv_list:
-        hv_list.remove('tfidf')
-    if "pca" in hv_list:
-        hv_list.remove('pca')
-    if "TSNE" in hv_list:
-        hv_list.remove('TSNE')
-    if "summary" in hv_list:
-        hv_list.remove('summary')
-
-    # reformat data so don't have to use texthero built-in plotting 
+    for col in ["tfidf", "summary", "pca_x", "pca_y", "tsne_x", "tsne_y"]:
+        if col in hv_list:
+            hv_list.remove(col)
 
+    # setup labels (decides pca or tsne)
     if viz_type.lower() == "tsne":
-        # TSNE reformat
-        df_split_tsne = pd.DataFrame(viz_df["TSNE"].to_list(),
-                                     columns=['tsne_x', 'tsne_y'])
-        viz_df.drop(columns="TSNE", inplace=True)  # drop original PCA column
-        viz_df = pd.concat([viz_df, df_split_tsne], axis=1)  # merge dataframes
+        plt_coords = ['tsne_x', 'tsne_y']
     else:
-        # PCA reformat
-        df_split_pca = pd.DataFrame(viz_df["pca"].to_list(),
-                                    columns=['pca_x', 'pca_y'])
-        viz_df.drop(columns="pca", inplace=True)  # drop original PCA column
-        viz_df = pd.concat([viz_df, df_split_pca], axis=1)  # merge dataframes
+        plt_coords = ['pca_x', 'pca_y']
+
+    # add the coordinates as columns so don't have to use texthero built-in plotting
+    viz_df[plt_coords[0]] = coords[:, 0]
+    viz_df[plt_coords[1]] = coords[:, 1]
 
     # set up plot pars (width, title, text)
     w = int(h * (4 / 3))
@@ -424,26 +851,23 @@ def vizjobs_googleUSE(viz_df, text_col_name, USE_embedding, save_plot=False, h=7
     else:
         plot_title = td_str + " viz Jobs by '{}' via google USE {}".format(text_col_name,
                                                                            viz_type)
-    if show_text:
-        # adds company names to the plot if you want
-        viz_df["companies_abbrev"] = viz_df["companies"].apply(text_first_N, num=15)
-        graph_text_label = "companies_abbrev"
-    else:
-        graph_text_label = None
-
-    # setup labels (decides pca or tsne)
-    if viz_type.lower() == "tsne":
-        plt_coords = ['tsne_x', 'tsne_y']
-    else:
-        plt_coords = ['pca_x', 'pca_y']
 
     # plot dimension-reduced data
 
-    viz_df.dropna(inplace=True)
+    viz_df = viz_df.dropna()
+
+    if show_text:
+        # adds company names to the plot if you want. passed as one array to the
+        # scatter trace (no extra dataframe column or per-point annotations)
+        graph_text_label = text_first_N_series(viz_df["companies"], num=15).to_numpy()
+    else:
+        graph_text_label = None
 
     fig_use = px.scatter(viz_df, x=plt_coords[0], y=plt_coords[1], color="kmeans",
                          hover_data=hv_list, title=plot_title, height=h, width=w,
                          template="plotly_dark", text=graph_text_label)
+    if show_text:
+        fig_use.update_traces(textposition="top center")
     fig_use.show()
 
     # save if requested 
@@ -452,18 +876,18 @@ def vizjobs_googleUSE(viz_df, text_col_name, USE_embedding, save_plot=False, h=7
         # saves the HTML file 
         # auto-saving as a static image is a lil difficult so just click on the interactive
         # plot it generates 
-        fig_use.write_html(plot_title + query_name + "_" + text_col_name + ".html",
-                           include_plotlyjs=True)
+        save_plot_html(fig_use, plot_title + query_name + "_" + text_col_name,
+                       coords, viz_df['kmeans'], viz_type)
 
     print("plot generated - ", datetime.now())
 
 
 def find_CHjobs_from(website, desired_characs, job_query, job_type=None,
-                     language=None, verbose=False,
-                     filename=date.today().strftime("%b-%d-%Y") + "_[raw]_scraped_jobs_CH.xls"):
+                     language=None, verbose=False, pages=1,
+                     filename=date.today().strftime("%b-%d-%Y") + "_[raw]_scraped_jobs_CH.xlsx"):
     if website == 'indeed':
-        sp_search = load_indeed_jobs_CH(job_query,
-                                        job_type=job_type, language=language)
+        sp_search = load_indeed_jobs_CH(job_query, job_type=job_type,
+                                        language=language, pages=pages)
         job_soup = sp_search.get("job_soup")
         URL_used = sp_search.get("query_URL")
 
@@ -474,7 +898,7 @@ def find_CHjobs_from(website, desired_characs, job_query, job_type=None,
                                                                    desired_characs,
                                                                    uURL=URL_used)
     elif website == 'indeed_default':
-        sp_search = load_indeed_jobs_CH(job_query, run_default=True)
+        sp_search = load_indeed_jobs_CH(job_query, run_default=True, pages=pages)
         job_soup = sp_search.get("job_soup")
         URL_used = sp_search.get("query_URL")
         if verbose:
@@ -494,35 +918,44 @@ def find_CHjobs_from(website, desired_characs, job_query, job_type=None,
 
 
 def load_indeed_jobs_CH(job_query, job_type=None, language=None,
-                        run_default=False):
+                        run_default=False, pages=1, max_workers=8):
+    # 'pages' is the number of result pages to load, fetched concurrently by up to
+    # 'max_workers' threads. "job_soup" in the returned dict is a list with one soup per page
+
     i_website = "https://ch.indeed.com/Stellen?"
     def_website = "https://ch.indeed.com/Stellen?q=Switzerland+English&jt=internship"
+    # only the results column is parsed (with the C-based lxml parser)
+    results_strainer = SoupStrainer(id="resultsCol")
     if run_default:
         # switzerland has a unique page shown below, can run by default
         # website = "https://ch.indeed.com/Switzerland-English-Jobs"
 
         getVars = {'fromage': 'last', "limit": '50', 'sort': 'date'}
 
-        url = (def_website + urllib.parse.urlencode(getVars))
-        page = requests.get(url)
-        soup = BeautifulSoup(page.content, "html.parser")
-        job_soup = soup.find(id="resultsCol")
+        # def_website already has a query string, so join with '&' not '?'
+        url = (def_website + "&" + urllib.parse.urlencode(getVars))
     else:
         getVars = {'q': job_query, 'jt': job_type, 'lang': language,
                    'fromage': 'last', "limit": '50', 'sort': 'date'}
 
         # if values are not specified, then remove them from the dict (and URL)
-        if job_query is None:
-            del getVars['q']
-        if job_type is None:
-            del getVars['jt']
-        if language is None:
-            del getVars['lang']
+        getVars = {k: v for k, v in getVars.items() if v is not None}
 
         url = (i_website + urllib.parse.urlencode(getVars))
-        page = requests.get(url)
-        soup = BeautifulSoup(page.content, "html.parser")
-        job_soup = soup.find(id="resultsCol")
+
+    # each page holds 'limit' results, later pages are offset with 'start'
+    page_size = int(getVars["limit"])
+    page_urls = [url] + [url + "&" + urllib.parse.urlencode({"start": page_size * p})
+                         for p in range(1, pages)]
+
+    def fetch_and_parse(page_url):
+        # each worker parses its own page right after downloading it, so parsing
+        # overlaps with the other pages still in flight
+        page = http_session.get(page_url, timeout=http_timeout)
+        return BeautifulSoup(page.content, "lxml", parse_only=results_strainer)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(page_urls))) as ex:
+        job_soup = list(ex.map(fetch_and_parse, page_urls))
 
     # return the job soup
 
@@ -535,72 +968,48 @@ def load_indeed_jobs_CH(job_query, job_type=None, language=None,
 
 
 def_URL = "https://ch.indeed.com/Stellen?" + "ADD_queries_here"
+job_elements_lock = threading.Lock()  # scrapes may run in parallel threads
 
 
 def extract_job_information_indeedCH(job_soup, desired_characs, uURL=def_URL,
                                      verbose=False, print_all=False):
+    # 'job_soup' is either one soup or a list of them (one per results page)
+    if not isinstance(job_soup, list):
+        job_soup = [job_soup]
+
     # job_elems = job_soup.find_all('div', class_='mosaic-zone-jobcards')
-    job_elems = job_soup.find_all('div', class_="job_seen_beacon")
+    job_elems = []
+    for page_soup in job_soup:
+        job_elems.extend(page_soup.find_all('div', class_="job_seen_beacon"))
 
     if print_all:
         print("\nAll found 'job elements' are as follows: \n")
         pp.pprint(job_elems, compact=True)
 
-    with open('job_elements.txt', 'w') as f:
+    with job_elements_lock, open('job_elements.txt', 'w') as f:
         # save to text file for investigation
         print(job_elems, file=f)
 
-    cols = []
-    extracted_info = []
-
-    if 'titles' in desired_characs:
-        titles = []
-        cols.append('titles')
-        for job_elem in job_elems:
-            titles.append(extract_job_title_indeed(job_elem,
-                                                   verbose=verbose))
-        extracted_info.append(titles)
-
-    if 'companies' in desired_characs:
-        companies = []
-        cols.append('companies')
-        for job_elem in job_elems:
-            companies.append(extract_company_indeed(job_elem))
-        extracted_info.append(companies)
-
-    if 'date_listed' in desired_characs:
-        dates = []
-        cols.append('date_listed')
-        for job_elem in job_elems:
-            dates.append(extract_date_indeed(job_elem))
-        extracted_info.append(dates)
-
-    if 'summary' in desired_characs:
-        summaries = []
-        cols.append('summary')
-        for job_elem in job_elems:
-            summaries.append(extract_summary_indeed(job_elem))
-        extracted_info.append(summaries)
-
-    if 'links' in desired_characs:
-        links = []
-        cols.append('links')
-        for job_elem in job_elems:
-            links.append(extract_link_indeedCH(job_elem, uURL))
-        extracted_info.append(links)
-
-    jobs_list = {}
-
-    for j in range(len(cols)):
-        jobs_list[cols[j]] = extracted_info[j]
-
-    num_listings = len(extracted_info[0])
+    # columnar: one list per requested field, filled in one pass over the job
+    # elements, then handed to pandas as-is (no per-listing dicts)
+    extractors = {field: fn for field, fn in indeed_extractors.items()
+                  if field in desired_characs}
+    jobs_list = {field: [] for field in extractors}
+    for job_elem in job_elems:
+        for field, extract_fn in extractors.items():
+            jobs_list[field].append(extract_fn(job_elem, uURL, verbose))
+
+    num_listings = len(job_elems)
 
     return jobs_list, num_listings
 
 
-def extract_job_title_indeed(job_elem, verbose=False):
-    title_elem = job_elem.select_one("span[title]").text
+# all extract_* functions share the signature (job_elem, uURL, verbose), see
+# indeed_extractors. arguments a field doesn't need are ignored
+
+def extract_job_title_indeed(job_elem, uURL=None, verbose=False):
+    # plain tree search, avoids compiling/matching a css selector (soupsieve) per listing
+    title_elem = job_elem.find('span', title=True).text
     if verbose: print(title_elem)
     try:
         title = title_elem.strip()
@@ -609,13 +1018,13 @@ def extract_job_title_indeed(job_elem, verbose=False):
     return title
 
 
-def extract_company_indeed(job_elem):
+def extract_company_indeed(job_elem, uURL=None, verbose=False):
     company_elem = job_elem.find('span', class_='companyName')
     company = company_elem.text.strip()
     return company
 
 
-def extract_link_indeedCH(job_elem, uURL):
+def extract_link_indeedCH(job_elem, uURL, verbose=False):
     # some manual shenanigans occur here
     # working example https://ch.indeed.com/Stellen?q=data&jt=internship&lang=en&vjk=49ed864bd5e422fb
 
@@ -626,25 +1035,57 @@ def extract_link_indeedCH(job_elem, uURL):
     return link.replace("/rc/clk?jk=", "vjk=")
 
 
-def extract_date_indeed(job_elem):
+def extract_date_indeed(job_elem, uURL=None, verbose=False):
     date_elem = job_elem.find('span', class_='date')
     date = date_elem.text.strip()
     return date
 
 
-def extract_summary_indeed(job_elem):
+def extract_summary_indeed(job_elem, uURL=None, verbose=False):
     summary_elem = job_elem.find('div', class_='job-snippet')
     summary = summary_elem.text.strip()
     return summary
 
 
+# field name -> extractor(job_elem, uURL, verbose), in output column order
+indeed_extractors = {
+    'titles': extract_job_title_indeed,
+    'companies': extract_company_indeed,
+    'date_listed': extract_date_indeed,
+    'summary': extract_summary_indeed,
+    'links': extract_link_indeedCH,
+}
+
+
+# html tags, standalone numbers, punctuation/symbols (and underscores)
+clean_text_re = re.compile(r"<[^>]+>|\b\d+\b|[^\w\s]|_")
+diacritics_re = re.compile(r"[\u0300-\u036f]")
+whitespace_re = re.compile(r"\s+")
+
+
+def clean_text(text_series):
+    # vectorized (pandas .str) take on texthero's default clean(): lowercase,
+    # strip accents, drop html tags / standalone digits / punctuation and
+    # collapse whitespace. unlike hero.clean, stopwords are kept
+
+    return (
+        text_series.fillna("").astype(str)
+            .str.lower()
+            .str.normalize("NFKD")
+            .str.replace(diacritics_re, "", regex=True)
+            .str.replace(clean_text_re, " ", regex=True)
+            .str.replace(whitespace_re, " ", regex=True)
+            .str.strip()
+    )
+
+
 def indeed_postprocess(i_df, query_term, query_jobtype, verbose=False,
                        shorten_links=False):
     print("Starting postprocess - ", datetime.now())
 
-    # apply texthero cleaning
-    i_df["titles"] = hero.clean(i_df["titles"])
-    i_df["summary"] = hero.clean(i_df["summary"])
+    # clean up text columns
+    i_df["titles"] = clean_text(i_df["titles"])
+    i_df["summary"] = clean_text(i_df["summary"])
 
     # use bit.ly to shorten links
     if shorten_links:
@@ -653,8 +1094,12 @@ def indeed_postprocess(i_df, query_term, query_jobtype, verbose=False,
             print("found values for short_link, not-recreating")
         except:
             print("no values exist for short_link, creating them now")
-            # there is a random delay to not overload APIs, max rt is 5s * num_rows
-            i_df["short_link"] = i_df["links"].apply(shorten_URL_bitly)
+            # links are shortened concurrently, rate limited to not overload the API
+            limiter = RateLimiter(calls_per_sec=bitly_max_qps)
+            with ThreadPoolExecutor(max_workers=8) as ex:
+                i_df["short_link"] = list(ex.map(
+                    lambda url: shorten_URL_bitly(url, rate_limiter=limiter),
+                    i_df["links"]))
     else:
         i_df["short_link"] = "not_created"
 
@@ -664,7 +1109,7 @@ def indeed_postprocess(i_df, query_term, query_jobtype, verbose=False,
     i_df["date_pulled"] = rn.strftime("%m.%d.%Y")
     i_df["time_pulled"] = rn.strftime("%H:%M:%S")
     out_name = "JS_DB_" + "query=[term(s)=" + query_term + ", type=" + query_jobtype + "]" + i_PP_date + ".xlsx"
-    i_df.to_excel(out_name)
+    i_df.to_excel(out_name, engine="xlsxwriter")
     if verbose: print("Saved {} - ".format(out_name), datetime.now())
 
     # download if requested
@@ -680,7 +1125,7 @@ def indeed_datatable(i_df, count_what="companies", freq_n=10):
     pp.pprint(comp_list_1.head(freq_n), compact=True)
 
     i_df_disp = i_df.copy()
-    i_df_disp["summary_short"] = i_df_disp["summary"].apply(text_first_N)
+    i_df_disp["summary_short"] = text_first_N_series(i_df_disp["summary"])
     i_df_disp.drop(columns=["links", "summary"], inplace=True)  # drop verbose columns
 
     return i_df_disp
@@ -699,8 +1144,24 @@ desired_characs = ['titles', 'companies', 'links',
                    'date_listed', 'summary']
 
 if __name__ == '__main__':
+    from joblib import Memory
+
+    parser = argparse.ArgumentParser(description="scrape and visualize Swiss job postings")
+    parser.add_argument("--fresh", action="store_true",
+                        help="clear cached scrapes and re-scrape everything")
+    args, _ = parser.parse_known_args()  # notebooks pass their own args
+
     output_folder_path = os.getcwd()
 
+    # scraping + postprocessing results are cached on disk, so re-running the
+    # script (i.e. while tuning plots) skips the scraping. the raw output
+    # filename includes the date, so cached scrapes are only reused on the same day
+    memory = Memory(join(output_folder_path, ".cache_jobs"), verbose=0)
+    if args.fresh:
+        memory.clear(warn=False)
+    cached_find_CHjobs_from = memory.cache(find_CHjobs_from, ignore=["verbose"])
+    cached_indeed_postprocess = memory.cache(indeed_postprocess, ignore=["verbose"])
+
     using_google_USE = True  # @param {type:"boolean"}
     using_gensim_w2v = False  # @param {type:"boolean"}
 
@@ -709,10 +1170,10 @@ if __name__ == '__main__':
     # Month abbreviation, day and year
     d4 = today.strftime("%b-%d-%Y")
 
-    default_filename = d4 + "_[raw]_scraped_jobs_CH.xls"
+    default_filename = d4 + "_[raw]_scraped_jobs_CH.xlsx"
 
     if using_google_USE:
-        meine_embeddings = load_google_USE()
+        meine_embeddings = google_USE_embedder(load_google_USE())
 
     if using_gensim_w2v:
         w2v_model = load_gensim_word2vec()
@@ -744,71 +1205,99 @@ if __name__ == '__main__':
     jt1 = "internship"  # @param {type:"string"}
     lan = "en"  # @param {type:"string"}
 
-    # variables for fn defined in form above
-
-    chdf1 = find_CHjobs_from(website="indeed", desired_characs=desired_characs,
-                             job_query=jq1, job_type=jt1, language=lan)
-
-    q1_processed = indeed_postprocess(chdf1, query_term=jq1, query_jobtype=jt1,
-                                      shorten_links=shorten_key)
-
-    indeed_datatable(q1_processed)
-
-    """**Viz Query 1**"""
-
-    viz1_df = q1_processed.copy()
-    viz1_df.drop(columns=["links", "short_link"], inplace=True)
-
-    if using_google_USE:
-
-        # general rule - if # of jobs returned > 25 may want to turn off text in
-        # one or both plots (summary text and title text)
-
-        vizjobs_googleUSE(viz1_df, "summary", meine_embeddings,
-                          save_plot=True, show_text=True,
-                          query_name=jt1 + " in " + jq1, viz_type="pca")
-
-        vizjobs_googleUSE(viz1_df, "titles", meine_embeddings,
-                          save_plot=True, show_text=False,
-                          query_name=jt1 + " in " + jq1, viz_type="pca")
-    else:
-        viz_job_data_word2vec(viz1_df, "summary", save_plot=True, h=720,
-                              query_name=jt1 + " in " + jq1, viz_type="pca")
-        viz_job_data_word2vec(viz1_df, "titles", save_plot=True, h=720,
-                              query_name=jt1 + " in " + jq1, viz_type="pca")
-
     # query 2 - all jobs in Switzerland for English Speakers
 
     jq2 = "indeed_default"  # passing this phrase in causes it to search for all en jobs
     jt2 = "all"
-    # in the case of "run the special case on Indeed" query terms don't matter
-    chdf2 = find_CHjobs_from(website="indeed_default", job_query="gimme",
-                             desired_characs=desired_characs)
 
-    q2_processed = indeed_postprocess(chdf2, query_term=jq2, query_jobtype=jt2,
-                                      shorten_links=False)
-
-    indeed_datatable(q2_processed)
+    # variables for fn defined in form above
+    # both scrapes are network-bound and independent, so run them concurrently.
+    # each gets its own raw output file so the two don't write to the same one
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f1 = ex.submit(cached_find_CHjobs_from, website="indeed", desired_characs=desired_characs,
+                       job_query=jq1, job_type=jt1, language=lan,
+                       filename=d4 + "_[raw]_scraped_jobs_CH_" + jt1 + "_" + jq1 + ".xlsx")
+        # in the case of "run the special case on Indeed" query terms don't matter
+        f2 = ex.submit(cached_find_CHjobs_from, website="indeed_default", job_query="gimme",
+                       desired_characs=desired_characs, filename=default_filename)
+        chdf1, chdf2 = f1.result(), f2.result()
+
+    q1_processed = cached_indeed_postprocess(chdf1, query_term=jq1, query_jobtype=jt1,
+                                             shorten_links=shorten_key)
 
-    """**Viz Query 2**"""
+    indeed_datatable(q1_processed)
 
-    viz_q2 = q2_processed.copy()
-    viz_q2.drop(columns="links", inplace=True)
+    q2_processed = cached_indeed_postprocess(chdf2, query_term=jq2, query_jobtype=jt2,
+                                             shorten_links=False)
 
-    if using_google_USE:
-
-        # general rule - if # of jobs returned > 25 may want to turn off text in
-        # one or both plots (summary text and title text)
+    indeed_datatable(q2_processed)
 
-        vizjobs_googleUSE(viz_q2, "summary", meine_embeddings,
-                          save_plot=True, show_text=True,
-                          query_name="all listings for CH eng. jobs", viz_type="tsne")
+    # only keep the columns needed for the plots. drop() returns a new frame, so no
+    # separate .copy() / inplace drop is needed
+    viz1_df = q1_processed.drop(columns=["links", "short_link"], errors="ignore")
+    viz_q2 = q2_processed.drop(columns="links", errors="ignore")
 
-        vizjobs_googleUSE(viz_q2, "titles", meine_embeddings,
-                          save_plot=True, show_text=False,
-                          query_name="all listings for CH eng. jobs", viz_type="tsne")
-    else:
-        viz_job_data_word2vec(viz_q2, "summary", save_plot=False, h=720,
-                              query_name="all listings for CH eng. jobs", viz_type="tsne")
-        viz_job_data_word2vec(viz_q2, "titles", save_plot=False, h=720,
-                              query_name="all listings for CH eng. jobs", viz_type="tsne")
+    # with google USE, the vectors of all four plots live in one memory-mapped
+    # scratch .npy that is private to this run and removed after the plots
+    use_vectors_path = None
+    try:
+        if using_google_USE:
+            # embed the text for all four plots in one batched pass
+            os.makedirs("embed_cache", exist_ok=True)
+            fd, use_vectors_path = tempfile.mkstemp(dir="embed_cache", suffix=".npy")
+            os.close(fd)
+            use_precomputed, use_vectors = precompute_embeddings(
+                [(viz1_df, "summary"), (viz1_df, "titles"), (viz_q2, "summary"), (viz_q2, "titles")],
+                meine_embeddings, memmap_path=use_vectors_path)
+            # the pre-tsne pca is fit once on the vectors of all four plots, each
+            # plot then only needs a transform
+            shared_pca = fit_shared_pca(use_vectors)
+
+        """**Viz Query 1**"""
+
+        if using_google_USE:
+
+            # general rule - if # of jobs returned > 25 may want to turn off text in
+            # one or both plots (summary text and title text)
+
+            vizjobs_googleUSE(viz1_df, "summary", meine_embeddings,
+                              save_plot=True, show_text=True,
+                              query_name=jt1 + " in " + jq1, viz_type="pca",
+                              precomputed=use_precomputed, pca_model=shared_pca)
+
+            vizjobs_googleUSE(viz1_df, "titles", meine_embeddings,
+                              save_plot=True, show_text=False,
+                              query_name=jt1 + " in " + jq1, viz_type="pca",
+                              precomputed=use_precomputed, pca_model=shared_pca)
+        else:
+            viz_job_data_word2vec(viz1_df, "summary", save_plot=True, h=720,
+                                  query_name=jt1 + " in " + jq1, viz_type="pca")
+            viz_job_data_word2vec(viz1_df, "titles", save_plot=True, h=720,
+                                  query_name=jt1 + " in " + jq1, viz_type="pca")
+
+        """**Viz Query 2**"""
+
+        if using_google_USE:
+
+            # general rule - if # of jobs returned > 25 may want to turn off text in
+            # one or both plots (summary text and title text)
+
+            vizjobs_googleUSE(viz_q2, "summary", meine_embeddings,
+                              save_plot=True, show_text=True,
+                              query_name="all listings for CH eng. jobs", viz_type="tsne",
+                              precomputed=use_precomputed, pca_model=shared_pca)
+
+            vizjobs_googleUSE(viz_q2, "titles", meine_embeddings,
+                              save_plot=True, show_text=False,
+                              query_name="all listings for CH eng. jobs", viz_type="tsne",
+                              precomputed=use_precomputed, pca_model=shared_pca)
+        else:
+            viz_job_data_word2vec(viz_q2, "summary", save_plot=False, h=720,
+                                  query_name="all listings for CH eng. jobs", viz_type="tsne")
+            viz_job_data_word2vec(viz_q2, "titles", save_plot=False, h=720,
+                                  query_name="all listings for CH eng. jobs", viz_type="tsne")
+    finally:
+        if use_vectors_path is not None:
+            # release the memory-mapped views before removing the scratch file
+            use_precomputed = use_vectors = None
+            os.remove(use_vectors_path)